@@ -1,11 +1,16 @@
 import os
-import json
+import asyncio
 import hashlib
 import logging
+import re
+from contextlib import aclosing
+from urllib.parse import quote
 from datetime import datetime, UTC
 
 import aiohttp
 import discord
+import ijson
+import orjson
 from discord import app_commands
 from discord.ext import tasks
 from dotenv import load_dotenv
@@ -30,10 +35,12 @@ RIVAL_TEAM = "People's Education Society University - PESU1"
 SNAPSHOT_FILE = "snapshot.json"
 CTFD_BASE = "https://ectf.ctfd.io"
 REMOTE_SCENARIO_URL = "https://rules.ectf.mitre.org/2026/flags/remote_scenario.html"
+REMOTE_SCENARIO_UNCHANGED = "UNCHANGED"  # server replied 304 Not Modified
+REMOTE_SCENARIO_MARKER = b'<section id="remote-scenario">'
 
 # SCOREBOARD PAGINATION
 PER_PAGE = 100
-MAX_PAGES = 10  # safety cap
+SCOREBOARD_CONCURRENCY = 5  # parallel page requests to CTFd
 
 # ======================
 # LOGGING
@@ -43,6 +50,43 @@ logging.basicConfig(
     format="%(asctime)s | %(levelname)s | %(message)s"
 )
 
+# ======================
+# HTTP HEADERS
+# ======================
+# Built once at import; they never change while the bot runs
+DEFAULT_HEADERS = {"User-Agent": "CTFd-Discord-Bot/1.0"}
+
+# Sent only to CTFd: the token must not leak to other hosts, and the rules
+# page is HTML, so it shouldn't be asked for JSON
+CTFD_HEADERS = {"Accept": "application/json"}
+if CTFD_TOKEN:
+    CTFD_HEADERS["Authorization"] = f"Token {CTFD_TOKEN}"
+
+# ======================
+# HTTP SESSION
+# ======================
+# Single session shared by every fetcher so connections to CTFd are
+# kept alive and pooled instead of reconnecting on every request.
+_session: aiohttp.ClientSession | None = None
+
+def create_session():
+    return aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=20),
+        headers=DEFAULT_HEADERS,
+        connector=aiohttp.TCPConnector(
+            limit=20,
+            limit_per_host=10,
+            ttl_dns_cache=300,
+            keepalive_timeout=60
+        )
+    )
+
+async def close_session():
+    global _session
+    if _session and not _session.closed:
+        await _session.close()
+    _session = None
+
 # ======================
 # DISCORD CLIENT
 # ======================
@@ -51,86 +95,130 @@ intents.message_content = True
 client = discord.Client(intents=intents)
 tree = app_commands.CommandTree(client)
 
+# Resolved channels, so we only hit the REST API on a gateway cache miss
+_channel_cache: dict[int, discord.abc.Messageable] = {}
+
+# Cleared after the first failed team search so later cycles go straight to the scan
+_team_search_available = True
+
 # ======================
 # STATE HANDLING
 # ======================
-def load_snapshot():
-    if not os.path.exists(SNAPSHOT_FILE):
-        return {
-            "hash": None,
-            "challenges": [],
-            "scoreboard": {},
-            "solved": [],
-            "remote_scenario_hash": None
-        }
+# Loaded once in on_ready, updated in place by monitor, saved only when dirty
+_snapshot: dict | None = None
+_snapshot_dirty = False
+
+def empty_snapshot():
+    return {
+        "hash": None,
+        "challenges": {},
+        "scoreboard": {},
+        "solved": [],
+        "remote_scenario_hash": None,
+        "remote_scenario_etag": None,
+        "remote_scenario_last_modified": None
+    }
 
+def load_snapshot():
     try:
-        with open(SNAPSHOT_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, OSError):
+        with open(SNAPSHOT_FILE, "rb") as f:
+            snapshot = orjson.loads(f.read())
+    except FileNotFoundError:
+        return empty_snapshot()
+    except (orjson.JSONDecodeError, OSError):
         logging.warning("Snapshot file corrupted or unreadable. Resetting snapshot.")
-        return {
-            "hash": None,
-            "challenges": [],
-            "scoreboard": {},
-            "solved": [],
-            "remote_scenario_hash": None
+        return empty_snapshot()
+
+    # Older snapshots stored challenges as a list of dicts
+    if isinstance(snapshot.get("challenges"), list):
+        snapshot["challenges"] = {
+            c["name"]: {"value": c.get("value"), "category": c.get("category")}
+            for c in snapshot["challenges"]
+            if c.get("name") is not None
         }
 
-def save_snapshot(data):
-    with open(SNAPSHOT_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    return snapshot
 
-# ======================
-# AUTH HEADERS
-# ======================
-def auth_headers():
-    headers = {
-        "User-Agent": "CTFd-Discord-Bot/1.0",
-        "Accept": "application/json"
-    }
-    if CTFD_TOKEN:
-        headers["Authorization"] = f"Token {CTFD_TOKEN}"
-    return headers
+def write_snapshot(data):
+    # Write to a temp file and swap it in so a crash never leaves a half-written snapshot
+    tmp_file = f"{SNAPSHOT_FILE}.tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_file, SNAPSHOT_FILE)
+
+async def save_snapshot(data):
+    # Disk writes on the Pi's SD card can stall; keep them off the event loop
+    await asyncio.to_thread(write_snapshot, data)
 
 # ======================
 # API FETCH
 # ======================
 async def fetch_json(url):
-    timeout = aiohttp.ClientTimeout(total=20)
-    async with aiohttp.ClientSession(timeout=timeout) as session:
-        async with session.get(url, headers=auth_headers()) as resp:
-            resp.raise_for_status()
-            return await resp.json()
-
-async def fetch_html(url):
-    timeout = aiohttp.ClientTimeout(total=20)
-    async with aiohttp.ClientSession(timeout=timeout) as session:
-        async with session.get(url) as resp:
-            resp.raise_for_status()
-            return await resp.text()
+    async with _session.get(url, headers=CTFD_HEADERS) as resp:
+        resp.raise_for_status()
+        # Parse the raw bytes with orjson instead of decoding to str first
+        return orjson.loads(await resp.read())
+
+async def fetch_html(url, headers=None):
+    """Return (body, etag, last_modified); body is raw bytes, or None on 304 Not Modified."""
+    async with _session.get(url, headers=headers) as resp:
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if resp.status == 304:
+            return None, etag, last_modified
+        resp.raise_for_status()
+        return await resp.read(), etag, last_modified
 
 async def fetch_challenges():
     return await fetch_json(f"{CTFD_BASE}/api/v1/challenges")
 
-async def fetch_scoreboard_page(page):
+async def iter_scoreboard_entries(page, meta=None):
+    """Stream scoreboard entries one at a time instead of parsing the whole page.
+
+    If ``meta`` is a dict, the total page count is stored in ``meta["pages"]``
+    once the parser reaches it.
+    """
     url = f"{CTFD_BASE}/api/v1/scoreboard?page={page}&per_page={PER_PAGE}"
+    async with _session.get(url, headers=CTFD_HEADERS) as resp:
+        resp.raise_for_status()
+
+        builder = None
+        async for prefix, event, value in ijson.parse_async(resp.content, use_float=True):
+            if builder is not None:
+                builder.event(event, value)
+                if prefix == "data.item" and event == "end_map":
+                    yield builder.value
+                    builder = None
+            elif prefix == "data.item" and event == "start_map":
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+            elif meta is not None and prefix == "meta.pagination.pages" and event == "number":
+                meta["pages"] = value
+
+async def fetch_team_search(name):
+    url = f"{CTFD_BASE}/api/v1/teams?q={quote(name)}&field=name"
     return await fetch_json(url)
 
+async def fetch_team(team_id):
+    return await fetch_json(f"{CTFD_BASE}/api/v1/teams/{team_id}")
+
 # ======================
 # EXTRACT DATA
 # ======================
 def extract_challenges(data):
-    challenges = []
+    # Keyed by name so diffs against the snapshot are plain dict lookups
+    challenges = {}
     solved = []
 
     for item in data.get("data", []):
         name = item.get("name")
-        challenges.append({
-            "name": name,
+        if name is None:
+            continue
+
+        challenges[name] = {
             "value": str(item.get("value")),
             "category": item.get("category")
-        })
+        }
 
         # AUTHENTICATED FIELD
         if item.get("solved_by_me"):
@@ -141,53 +229,190 @@ def extract_challenges(data):
 # ======================
 # SCOREBOARD PARSER (eCTF + PAGINATION)
 # ======================
+def build_targets(*teams):
+    """Map both the exact and lowercased team names to the canonical name."""
+    targets = {}
+    for team in teams:
+        targets[team] = team
+        targets[team.lower()] = team
+    return targets
+
+def match_team_entry(entry, targets, result):
+    team_obj = entry.get("team", {})
+    raw_name = team_obj.get("name") or entry.get("name")
+
+    # Exact names match without allocating; only normalise on a miss
+    team = targets.get(raw_name) if isinstance(raw_name, str) else None
+    if team is None:
+        raw_name = str(raw_name).strip() if raw_name else ""
+        team = targets.get(raw_name.lower())
+
+    if team is not None:
+        result[team] = {
+            "rank": entry.get("pos") or entry.get("rank"),
+            "score": entry.get("score")
+        }
+
+async def scan_scoreboard_page(page, targets, meta=None):
+    """Return (matches, entries_seen) for one page, stopping once all targets are found."""
+    result = {}
+    seen = 0
+    wanted = len(set(targets.values()))
+
+    async with aclosing(iter_scoreboard_entries(page, meta)) as entries:
+        async for entry in entries:
+            seen += 1
+            match_team_entry(entry, targets, result)
+            if len(result) == wanted:
+                break
+
+    return result, seen
+
+async def scan_scoreboard_pages(pages, targets):
+    semaphore = asyncio.Semaphore(SCOREBOARD_CONCURRENCY)
+
+    async def scan(page):
+        async with semaphore:
+            return await scan_scoreboard_page(page, targets)
+
+    return await asyncio.gather(*(scan(p) for p in pages), return_exceptions=True)
+
+def parse_place(place):
+    # CTFd reports team place as an ordinal string ("5th")
+    if isinstance(place, int) or place is None:
+        return place
+    digits = re.sub(r"\D", "", str(place))
+    return int(digits) if digits else None
+
+async def fetch_team_by_name(name):
+    """Look up a single team's rank and score without scanning the scoreboard."""
+    data = await fetch_team_search(name)
+    key = name.lower()
+
+    for team in data.get("data", []):
+        if str(team.get("name") or "").strip().lower() != key:
+            continue
+
+        detail = (await fetch_team(team["id"])).get("data", {})
+        rank = parse_place(detail.get("place"))
+        if rank is None:
+            return None
+        return {"rank": rank, "score": detail.get("score")}
+
+    return None
+
+def search_is_unsupported(error):
+    """True when the error means search will never work here, not a transient blip."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in (403, 404)
+    # Non-JSON bodies and unexpected shapes won't fix themselves either
+    return isinstance(error, (ValueError, KeyError))
+
 async def extract_team_positions(my_team, rival_team):
+    global _team_search_available
+
+    if not _team_search_available:
+        return await scan_scoreboard_positions(my_team, rival_team)
+
+    try:
+        mine, rival = await asyncio.gather(
+            fetch_team_by_name(my_team),
+            fetch_team_by_name(rival_team)
+        )
+    except (aiohttp.ClientError, ValueError, KeyError) as e:
+        if search_is_unsupported(e):
+            _team_search_available = False
+            logging.warning(f"Team search unavailable ({e}). Using scoreboard scan from now on.")
+        else:
+            logging.warning(f"Team search failed ({e}). Falling back to scoreboard scan.")
+        return await scan_scoreboard_positions(my_team, rival_team)
+
     result = {}
+    if mine:
+        result[my_team] = mine
+    if rival:
+        result[rival_team] = rival
+
+    # A team search did not resolve (e.g. no place yet): only scan for that one
+    missing = [team for team in (my_team, rival_team) if team not in result]
+    if missing:
+        result.update(await scan_scoreboard_positions(*missing))
+    return result
 
-    targets = {
-        my_team.lower(): my_team,
-        rival_team.lower(): rival_team
-    }
+async def scan_scoreboard_positions(*teams):
+    targets = build_targets(*teams)
+    wanted = len(set(targets.values()))
 
-    for page in range(1, MAX_PAGES + 1):
-        data = await fetch_scoreboard_page(page)
-        entries = data.get("data", [])
+    # First page tells us how many pages actually exist
+    meta = {}
+    result, seen = await scan_scoreboard_page(1, targets, meta)
 
-        if not entries:
-            break
+    if not seen or len(result) == wanted:
+        return result
+
+    # No pagination metadata means the whole scoreboard came back in one page
+    last_page = meta.get("pages") or 1
+
+    # Later pages only need to look for teams page 1 did not contain, so
+    # each page scan can stop as soon as those are found
+    remaining = {key: team for key, team in targets.items() if team not in result}
 
-        for entry in entries:
-            team_obj = entry.get("team", {})
-            raw_name = team_obj.get("name") or entry.get("name")
-            raw_name = str(raw_name).strip() if raw_name else ""
-            key = raw_name.lower()
+    # Scan the remaining pages concurrently, then merge them in order
+    pages = range(2, last_page + 1)
+    for page_result in await scan_scoreboard_pages(pages, remaining):
+        if isinstance(page_result, BaseException):
+            raise page_result
 
-            if key in targets:
-                result[targets[key]] = {
-                    "rank": entry.get("pos") or entry.get("rank"),
-                    "score": entry.get("score")
-                }
+        found, seen = page_result
+        if not seen:
+            break
+
+        result.update(found)
 
-        # Stop early if both teams found
-        if len(result) == len(targets):
+        # Stop early once every team is found
+        if len(result) == wanted:
             break
 
     return result
 
-def hash_content(text):
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def hash_challenges(data):
+    """Hash only the challenge fields we diff on, in a stable order."""
+    h = hashlib.sha256()
+    items = sorted(data.get("data", []), key=lambda c: str(c.get("name")))
+    for c in items:
+        h.update(
+            f"{c.get('id')}|{c.get('name')}|{c.get('value')}|"
+            f"{c.get('category')}|{bool(c.get('solved_by_me'))}\n".encode("utf-8")
+        )
+    return h.hexdigest()
+
+async def check_remote_scenario(etag=None, last_modified=None):
+    """Fetch and extract remote scenario section from the rules page.
+
+    Returns (content, etag, last_modified). Sends a conditional request when
+    validators from a previous fetch are given; content is
+    REMOTE_SCENARIO_UNCHANGED if the server answers 304.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
 
-async def check_remote_scenario():
-    """Fetch and extract remote scenario section from the rules page."""
     try:
-        html = await fetch_html(REMOTE_SCENARIO_URL)
+        html, new_etag, new_last_modified = await fetch_html(REMOTE_SCENARIO_URL, headers)
+        if html is None:
+            return REMOTE_SCENARIO_UNCHANGED, new_etag or etag, new_last_modified or last_modified
         # Look for the remote-scenario section
-        if '<section id="remote-scenario">' in html:
-            return html
-        return None
+        if REMOTE_SCENARIO_MARKER in html:
+            return html, new_etag, new_last_modified
+        return None, None, None
     except Exception as e:
         logging.error(f"Failed to fetch remote scenario: {e}")
-        return None
+        return None, None, None
 
 # ======================
 # TERMINAL PRINT
@@ -200,69 +425,129 @@ def print_scoreboard_status(status, solved):
         print(f"  Solved by {MY_TEAM}:", ", ".join(solved))
     print()
 
+# ======================
+# STATUS FORMAT
+# ======================
+def format_status_lines(positions, solved):
+    """Build the scoreboard status embed lines shared by monitor and /status."""
+    lines = []
+    for team in (MY_TEAM, RIVAL_TEAM):
+        info = positions.get(team)
+        if info:
+            lines.append(
+                f"**{team}** → Rank: {info['rank']} | Score: {info['score']}"
+            )
+        else:
+            lines.append(f"**{team}** → Not found on scoreboard")
+
+    if solved:
+        lines.append("")
+        lines.append(f"✅ **Total Solved:** {len(solved)}")
+        if len(solved) <= 5:
+            for s in solved:
+                lines.append(f"- {s}")
+        else:
+            lines.append(f"*(...and {len(solved)-5} more)*")
+
+    return lines
+
 # ======================
 # DISCORD MESSAGING
 # ======================
+async def get_channel(channel_id):
+    channel = _channel_cache.get(channel_id) or client.get_channel(channel_id)
+    if channel is None:
+        channel = await client.fetch_channel(channel_id)
+    _channel_cache[channel_id] = channel
+    return channel
+
 async def send_embed(title, description, color=0x3498db, ping=False):
+    channels = []
     for channel_id in CHANNEL_IDS:
         try:
-            channel = await client.fetch_channel(channel_id)
+            channels.append(await get_channel(channel_id))
         except Exception:
             logging.error(f"Channel not found or inaccessible: {channel_id}")
-            continue
 
-        embed = discord.Embed(
-            title=title,
-            description=description,
-            color=color,
-            timestamp=datetime.now(UTC)
-        )
-        embed.set_footer(text="CTFd Monitor")
+    embed = discord.Embed(
+        title=title,
+        description=description,
+        color=color,
+        timestamp=datetime.now(UTC)
+    )
+    embed.set_footer(text="CTFd Monitor")
+
+    content = "@everyone" if ping else None
 
-        content = "@everyone" if ping else None
-        await channel.send(content=content, embed=embed)
+    # Send to every channel at once; one failing channel must not block the rest
+    results = await asyncio.gather(
+        *(channel.send(content=content, embed=embed) for channel in channels),
+        return_exceptions=True
+    )
+    for channel, result in zip(channels, results):
+        if isinstance(result, Exception):
+            logging.error(f"Failed to send to channel {channel.id}: {result}")
 
 # ======================
 # MONITOR LOOP
 # ======================
 @tasks.loop(seconds=CHECK_INTERVAL)
 async def monitor():
+    global _snapshot, _snapshot_dirty
     logging.info("Checking CTFd status...")
 
     try:
-        snapshot = load_snapshot()
+        if _snapshot is None:
+            _snapshot = load_snapshot()
+        snapshot = _snapshot
+
+        # -------- FETCH (challenges, scoreboard, remote scenario) --------
+        # Only revalidate the rules page if we hold a hash to compare against
+        remote_validators = ()
+        if snapshot.get("remote_scenario_hash"):
+            remote_validators = (
+                snapshot.get("remote_scenario_etag"),
+                snapshot.get("remote_scenario_last_modified")
+            )
 
-        # -------- CHALLENGES --------
-        challenge_data = await fetch_challenges()
-        page_hash = hash_content(json.dumps(challenge_data, sort_keys=True))
+        challenge_data, positions, remote_scenario = await asyncio.gather(
+            fetch_challenges(),
+            extract_team_positions(MY_TEAM, RIVAL_TEAM),
+            check_remote_scenario(*remote_validators)
+        )
+        remote_scenario_content, remote_scenario_etag, remote_scenario_last_modified = remote_scenario
 
-        challenges, solved = extract_challenges(challenge_data)
+        # -------- CHALLENGES --------
+        page_hash = hash_challenges(challenge_data)
 
         # -------- DETECT CHANGES --------
         new_challenges = []
-        if page_hash != snapshot.get("hash"):
-            old_names = {c["name"] for c in snapshot.get("challenges", [])}
-            for chall in challenges:
-                if chall["name"] not in old_names:
-                    new_challenges.append(chall)
-
         new_solves = []
-        old_solved = set(snapshot.get("solved", []))
-        for s in solved:
-            if s not in old_solved:
-                new_solves.append(s)
-
-        # -------- SCOREBOARD --------
-        positions = await extract_team_positions(
-            MY_TEAM,
-            RIVAL_TEAM
-        )
+        if page_hash == snapshot.get("hash"):
+            # Hash covers every field we extract, so nothing can have changed
+            challenges = snapshot.get("challenges", {})
+            solved = snapshot.get("solved", [])
+        else:
+            challenges, solved = extract_challenges(challenge_data)
+
+            old_challenges = snapshot.get("challenges", {})
+            new_challenges = [
+                {"name": name, **info}
+                for name, info in challenges.items()
+                if name not in old_challenges
+            ]
+
+            old_solved = set(snapshot.get("solved", []))
+            for s in solved:
+                if s not in old_solved:
+                    new_solves.append(s)
 
         # -------- REMOTE SCENARIO --------
-        remote_scenario_content = await check_remote_scenario()
         remote_scenario_hash = None
-        if remote_scenario_content:
-            remote_scenario_hash = hash_content(remote_scenario_content)
+        if remote_scenario_content is REMOTE_SCENARIO_UNCHANGED:
+            remote_scenario_hash = snapshot.get("remote_scenario_hash")
+        elif remote_scenario_content:
+            remote_scenario_hash = hash_bytes(remote_scenario_content)
             old_remote_hash = snapshot.get("remote_scenario_hash")
             if old_remote_hash and remote_scenario_hash != old_remote_hash:
                 await send_embed(
@@ -275,35 +560,18 @@ async def monitor():
 
         # -------- ALERTS --------
         if new_challenges:
-            desc = "\n".join([f"**{c['name']}** ({c['category']}) - {c['value']} pts" for c in new_challenges])
+            desc = "\n".join(f"**{c['name']}** ({c['category']}) - {c['value']} pts" for c in new_challenges)
             await send_embed("🚨 NEW CHALLENGE RELEASED!", desc, 0xe74c3c, ping=True)
 
         if new_solves:
-            desc = "\n".join([f"**{s}**" for s in new_solves])
+            desc = "\n".join(f"**{s}**" for s in new_solves)
             await send_embed("✅ New Solve!", f"Solved by {MY_TEAM}:\n{desc}", 0x2ecc71, ping=True)
 
         # -------- DISCORD MESSAGE (STATUS) --------
         # Only ping if scoreboard changed
         old_positions = snapshot.get("scoreboard", {})
         if positions != old_positions:
-            lines = []
-            for team in (MY_TEAM, RIVAL_TEAM):
-                info = positions.get(team)
-                if info:
-                    lines.append(
-                        f"**{team}** → Rank: {info['rank']} | Score: {info['score']}"
-                    )
-                else:
-                    lines.append(f"**{team}** → Not found on scoreboard")
-
-            if solved:
-                lines.append("")
-                lines.append(f"✅ **Total Solved:** {len(solved)}")
-                if len(solved) <= 5: 
-                     for s in solved:
-                        lines.append(f"- {s}")
-                else:
-                    lines.append(f"*(...and {len(solved)-5} more)*")
+            lines = format_status_lines(positions, solved)
 
             await send_embed(
                 "📊 Current Scoreboard Status",
@@ -317,14 +585,23 @@ async def monitor():
 
         print_scoreboard_status(positions, solved)
 
-        # SAVE STATE
-        save_snapshot({
+        # SAVE STATE (only touch disk when something changed)
+        current = {
             "hash": page_hash,
             "challenges": challenges,
             "scoreboard": positions,
             "solved": solved,
-            "remote_scenario_hash": remote_scenario_hash
-        })
+            "remote_scenario_hash": remote_scenario_hash,
+            "remote_scenario_etag": remote_scenario_etag,
+            "remote_scenario_last_modified": remote_scenario_last_modified
+        }
+        if any(snapshot.get(key) != value for key, value in current.items()):
+            snapshot.update(current)
+            _snapshot_dirty = True
+
+        if _snapshot_dirty:
+            await save_snapshot(snapshot)
+            _snapshot_dirty = False
 
         logging.info("Check complete")
 
@@ -341,12 +618,20 @@ async def monitor():
 # ======================
 @client.event
 async def on_ready():
+    global _session, _snapshot
     logging.info(f"Logged in as {client.user}")
+
+    if _snapshot is None:
+        _snapshot = load_snapshot()
+
+    # on_ready fires again after reconnects; keep the existing session
+    if _session is None or _session.closed:
+        _session = create_session()
     
     # Sync commands to the specific guild for instant updates
     if CHANNEL_IDS:
         try:
-            channel = await client.fetch_channel(CHANNEL_IDS[0])
+            channel = await get_channel(CHANNEL_IDS[0])
             if channel:
                 guild = channel.guild
                 logging.info(f"Syncing commands to guild: {guild.name} ({guild.id})")
@@ -364,35 +649,19 @@ async def on_ready():
             logging.error(f"Failed to sync to guild: {e}")
 
     await send_embed("CTFd Monitor Online", "Bot has started monitoring. Slash commands synced.")
-    monitor.start()
+    if not monitor.is_running():
+        monitor.start()
 
 @tree.command(name="status", description="Check current scoreboard status manually")
 async def status(interaction: discord.Interaction):
     logging.info(f"Status command received from {interaction.user}")
     
-    # Load latest state
-    snapshot = load_snapshot()
+    # Latest state as kept in memory by the monitor loop
+    snapshot = _snapshot if _snapshot is not None else load_snapshot()
     positions = snapshot.get("scoreboard", {})
     solved = snapshot.get("solved", [])
     
-    lines = []
-    for team in (MY_TEAM, RIVAL_TEAM):
-        info = positions.get(team)
-        if info:
-            lines.append(
-                f"**{team}** → Rank: {info['rank']} | Score: {info['score']}"
-            )
-        else:
-            lines.append(f"**{team}** → Not found on scoreboard")
-
-    if solved:
-        lines.append("")
-        lines.append(f"✅ **Total Solved:** {len(solved)}")
-        if len(solved) <= 5: 
-                for s in solved:
-                    lines.append(f"- {s}")
-        else:
-            lines.append(f"*(...and {len(solved)-5} more)*")
+    lines = format_status_lines(positions, solved)
 
     embed = discord.Embed(
         title="📊 Current Scoreboard Status (Manual Check)",
@@ -409,23 +678,23 @@ async def check_temp(interaction: discord.Interaction):
     logging.info(f"Temp command received from {interaction.user}")
     
     try:
-        import subprocess
-        result = subprocess.run(
-            ["vcgencmd", "measure_temp"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        
-        if result.returncode == 0:
-            # Output format: "temp=54.0'C"
-            temp_str = result.stdout.strip().split("=")[1].replace("'C", "")
-            temp = float(temp_str)
-        else:
-            # Fallback: read from thermal zone
+        try:
+            # Thermal zone first: a plain file read, no process spawn
             with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
                 temp_millic = int(f.read().strip())
                 temp = temp_millic / 1000.0
+        except OSError:
+            import subprocess
+            result = subprocess.run(
+                ["vcgencmd", "measure_temp"],
+                capture_output=True,
+                text=True,
+                timeout=5,
+                check=True
+            )
+            # Output format: "temp=54.0'C"
+            temp_str = result.stdout.strip().split("=")[1].replace("'C", "")
+            temp = float(temp_str)
         
         # Determine status color
         if temp >= 85:
@@ -463,6 +732,13 @@ async def check_temp(interaction: discord.Interaction):
 # ======================
 # START
 # ======================
+async def main():
+    try:
+        async with client:
+            await client.start(TOKEN)
+    finally:
+        await close_session()
+
 if __name__ == "__main__":
     if not TOKEN:
         raise RuntimeError("DISCORD_TOKEN missing in .env")
@@ -473,4 +749,4 @@ if __name__ == "__main__":
     if not CTFD_TOKEN:
         raise RuntimeError("CTFD_TOKEN missing in .env")
 
-    client.run(TOKEN)
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -1,10 +1,11 @@
 import os
+import sys
+import shutil
 import subprocess
 import time
 import logging
 import json
 import asyncio
-import aiohttp
 from datetime import datetime, UTC
 from dotenv import load_dotenv
 import signal
@@ -16,6 +17,8 @@ PROJECT_DIR = "/home/pesu2/Discord-bot/Discord-Bot"
 VENV_PY = f"{PROJECT_DIR}/venv/bin/python"
 BOT_SCRIPT = f"{PROJECT_DIR}/bot.py"
 STATE_FILE = f"{PROJECT_DIR}/bot_state.json"
+BOT_LOG_FILE = f"{PROJECT_DIR}/bot.log"
+BOT_LOG_MAX_BYTES = 5 * 1024 * 1024  # checked every tick, rotated to bot.log.1
 
 # ======================
 # CONFIG
@@ -23,24 +26,54 @@ STATE_FILE = f"{PROJECT_DIR}/bot_state.json"
 load_dotenv(os.path.join(PROJECT_DIR, ".env"))
 
 TOKEN = os.getenv("DISCORD_TOKEN")
-CHANNEL_IDS = [int(x.strip()) for x in os.getenv("CHANNEL_IDS", "").split(",") if x.strip()]
+CHANNEL_IDS = tuple(int(x.strip()) for x in os.getenv("CHANNEL_IDS", "").split(",") if x.strip())
+
+# Fail fast when run as a script, before the heavier network imports below
+if __name__ == "__main__" and (not TOKEN or not CHANNEL_IDS):
+    sys.exit("Missing DISCORD_TOKEN or CHANNEL_IDS")
+
+import aiohttp
+import orjson
+from aiohttp_retry import JitterRetry, RetryClient
+
+# Discord request pieces never change at runtime, so build them once
+DISCORD_HEADERS = {
+    "Authorization": f"Bot {TOKEN}",
+    "Content-Type": "application/json"
+}
+ALERT_URLS = {
+    cid: f"https://discord.com/api/v10/channels/{cid}/messages"
+    for cid in CHANNEL_IDS
+}
 
 # Temperature thresholds
 TEMP_ALERT_THRESHOLD = 85
 TEMP_RESUME_THRESHOLD = 60
 TEMP_KILL_THRESHOLD = 90
-THROTTLE_DURATION = 300
 CHECK_INTERVAL = 10
-DISCORD_RETRY_DELAY = 30
+TEMP_LOG_EVERY = 30  # ticks between temperature logs in the steady state
+MAX_SENSOR_ERRORS = 5  # consecutive failed reads before alerting (strict mode)
+
+# MONITOR_STRICT=1 adds sensor-failure and shutdown alerts on top of the defaults
+MONITOR_STRICT = os.getenv("MONITOR_STRICT") == "1"
+DISCORD_RETRY_ATTEMPTS = 3
+DISCORD_RETRY_BASE_DELAY = 1.0
+DISCORD_RETRY_MAX_DELAY = 30
 
 # Process management
 BOT_PROCESS = None
 BOT_PID = None
 IS_THROTTLED = False
-THROTTLE_START_TIME = None
 MAX_RESTART_ATTEMPTS = 3
 RESTART_ATTEMPTS = 0
 
+# Set by SIGINT/SIGTERM; wakes the monitor loop immediately
+STOP = asyncio.Event()
+
+# Alerts are queued so a slow Discord POST never stalls temperature sampling
+ALERT_Q = asyncio.Queue(maxsize=16)
+ALERT_DRAIN_TIMEOUT = 15  # seconds to flush queued alerts on shutdown
+
 # ======================
 # LOGGING
 # ======================
@@ -52,54 +85,128 @@ logging.basicConfig(
 # ======================
 # STATE MANAGEMENT
 # ======================
+# In-memory state; transitions only mark it dirty and the monitor loop
+# writes it once per tick, so the SD card sees at most one write per change
+STATE = {"bot_running": False, "throttled": False}
+STATE_DIRTY = False
+PERSISTED_STATE = None
+
+def set_state(data):
+    global STATE_DIRTY
+    STATE.update(data)
+    STATE_DIRTY = True
+
 def save_state(data):
+    tmp_file = f"{STATE_FILE}.tmp"
     try:
-        with open(STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.write(json.dumps(data, separators=(",", ":")))
+        os.replace(tmp_file, STATE_FILE)
+        return True
     except Exception as e:
         logging.error(f"Failed to save state: {e}")
+        return False
+
+def flush_state():
+    global STATE_DIRTY, PERSISTED_STATE
+    if not STATE_DIRTY:
+        return
+    if STATE != PERSISTED_STATE and not save_state(STATE):
+        return  # keep dirty so the next tick retries
+    PERSISTED_STATE = dict(STATE)
+    STATE_DIRTY = False
 
 # ======================
 # TEMPERATURE CHECK
 # ======================
+THERMAL_ZONE = "/sys/class/thermal/thermal_zone0/temp"
+
+def open_thermal_zone():
+    try:
+        return os.open(THERMAL_ZONE, os.O_RDONLY)
+    except OSError:
+        return None
+
+def probe_temp_backend():
+    if _TEMP_FD is not None:
+        return "sysfs"
+    if shutil.which("vcgencmd"):
+        return "vcgencmd"
+    logging.error("No temperature source found (thermal zone or vcgencmd)")
+    return None
+
+# Opened once; each poll is a single pread instead of forking vcgencmd
+_TEMP_FD = open_thermal_zone()
+# Picked once at startup so polls never use exceptions for control flow
+_TEMP_BACKEND = probe_temp_backend()
+
+def read_vcgencmd_temperature():
+    result = subprocess.run(
+        ["vcgencmd", "measure_temp"],
+        capture_output=True,
+        text=True,
+        timeout=5
+    )
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.split("=")[1].replace("'C", ""))
+
 def get_pi_temperature():
     try:
-        result = subprocess.run(
-            ["vcgencmd", "measure_temp"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if result.returncode == 0:
-            return float(result.stdout.split("=")[1].replace("'C", ""))
-        with open("/sys/class/thermal/thermal_zone0/temp") as f:
-            return int(f.read()) / 1000
-    except Exception as e:
+        if _TEMP_BACKEND == "sysfs":
+            return int(os.pread(_TEMP_FD, 16, 0)) / 1000
+        if _TEMP_BACKEND == "vcgencmd":
+            return read_vcgencmd_temperature()
+    except (OSError, ValueError, IndexError, subprocess.SubprocessError) as e:
         logging.error(f"Temperature read failed: {e}")
-        return None
+    return None
 
 # ======================
 # BOT PROCESS CONTROL
 # ======================
-def start_bot():
+def rotate_bot_log():
+    # Copy-truncate keeps the running bot's O_APPEND fd valid, so one previous
+    # log plus the live one never hold much more than ~2x the cap
+    try:
+        if os.path.getsize(BOT_LOG_FILE) > BOT_LOG_MAX_BYTES:
+            shutil.copyfile(BOT_LOG_FILE, f"{BOT_LOG_FILE}.1")
+            os.truncate(BOT_LOG_FILE, 0)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logging.error(f"Bot log rotation failed: {e}")
+
+def open_bot_log():
+    return open(BOT_LOG_FILE, "ab", buffering=0)
+
+def bot_is_alive():
+    # returncode is filled in by asyncio's child watcher; no waitpid() here
+    return BOT_PROCESS is not None and BOT_PROCESS.returncode is None
+
+async def start_bot():
     global BOT_PROCESS, BOT_PID, IS_THROTTLED, RESTART_ATTEMPTS
 
-    if BOT_PROCESS and BOT_PROCESS.poll() is None:
+    if bot_is_alive():
         return True
 
     try:
         logging.info("Starting bot via venv python...")
-        BOT_PROCESS = subprocess.Popen(
-            [VENV_PY, BOT_SCRIPT],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            preexec_fn=os.setsid  # ensures clean kill tree
-        )
+        # Copying a full log can stall on the SD card, so keep it off the loop
+        await asyncio.to_thread(rotate_bot_log)
+        # Output goes to a file: nothing reads a PIPE, so the bot would
+        # eventually block once the pipe buffer filled up
+        with open_bot_log() as log:
+            BOT_PROCESS = await asyncio.create_subprocess_exec(
+                VENV_PY, BOT_SCRIPT,
+                stdout=log,
+                stderr=asyncio.subprocess.STDOUT,
+                start_new_session=True,  # own process group for a clean kill tree
+                close_fds=True  # don't leak the thermal zone fd into the bot
+            )
         BOT_PID = BOT_PROCESS.pid
         IS_THROTTLED = False
         RESTART_ATTEMPTS = 0
-        save_state({"bot_running": True, "throttled": False})
+        set_state({"bot_running": True, "throttled": False})
         logging.info(f"Bot started (PID {BOT_PID})")
         return True
     except Exception as e:
@@ -107,92 +214,216 @@ def start_bot():
         RESTART_ATTEMPTS += 1
         return False
 
-def stop_bot(force=False):
+async def stop_bot(force=False):
     global BOT_PROCESS, BOT_PID, IS_THROTTLED
 
-    if not BOT_PROCESS or BOT_PROCESS.poll() is not None:
+    if not bot_is_alive():
         return True
 
+    # Waiting is awaited so temperature polling and alerts keep running
     try:
         logging.warning(f"Stopping bot (PID {BOT_PID})")
         os.killpg(os.getpgid(BOT_PID), signal.SIGTERM)
-        BOT_PROCESS.wait(timeout=10)
-    except Exception:
+        await asyncio.wait_for(BOT_PROCESS.wait(), timeout=10)
+    except asyncio.TimeoutError:
         os.killpg(os.getpgid(BOT_PID), signal.SIGKILL)
+        await BOT_PROCESS.wait()
+    except ProcessLookupError:
+        pass  # already exited
 
     BOT_PROCESS = None
     BOT_PID = None
     IS_THROTTLED = False
-    save_state({"bot_running": False, "throttled": False})
+    set_state({"bot_running": False, "throttled": False})
     return True
 
+def set_priority(niceness):
+    # Direct setpriority(2) call instead of forking renice
+    try:
+        os.setpriority(os.PRIO_PROCESS, BOT_PID, niceness)
+    except PermissionError:
+        # Unprivileged users may only raise niceness, not lower it again
+        logging.warning(f"Not permitted to set niceness {niceness} for PID {BOT_PID}")
+    except ProcessLookupError:
+        logging.warning(f"Bot process {BOT_PID} no longer exists")
+
 def throttle_bot():
-    global IS_THROTTLED, THROTTLE_START_TIME
+    global IS_THROTTLED
     if BOT_PID and not IS_THROTTLED:
-        subprocess.run(["renice", "+10", str(BOT_PID)], check=False)
+        set_priority(10)
         IS_THROTTLED = True
-        THROTTLE_START_TIME = time.time()
+        set_state({"throttled": True})
 
 def unthrottle_bot():
     global IS_THROTTLED
     if BOT_PID and IS_THROTTLED:
-        subprocess.run(["renice", "0", str(BOT_PID)], check=False)
+        set_priority(0)
         IS_THROTTLED = False
+        set_state({"throttled": False})
 
 # ======================
 # DISCORD ALERTS
 # ======================
-async def send_alert(title, description, color):
-    for channel_id in CHANNEL_IDS:
-        async with aiohttp.ClientSession() as session:
-            await session.post(
-                f"https://discord.com/api/v10/channels/{channel_id}/messages",
-                headers={"Authorization": f"Bot {TOKEN}"},
-                json={"embeds": [{
-                    "title": title,
-                    "description": description,
-                    "color": color,
-                    "timestamp": datetime.now(UTC).isoformat()
-                }]}
-            )
+class DiscordRetry(JitterRetry):
+    """Jittered exponential backoff that waits out Discord's Retry-After on 429."""
+
+    def get_timeout(self, attempt, response=None):
+        if response is not None and response.status == 429:
+            try:
+                return min(float(response.headers["Retry-After"]), DISCORD_RETRY_MAX_DELAY)
+            except (KeyError, ValueError):
+                pass
+        return super().get_timeout(attempt, response)
+
+def alert_retry_options():
+    # 5xx are retried by default; other 4xx are returned as-is.
+    # Only errors raised before the POST went out are retried: after a read
+    # timeout or disconnect Discord may already have posted the alert.
+    return DiscordRetry(
+        attempts=DISCORD_RETRY_ATTEMPTS,
+        start_timeout=DISCORD_RETRY_BASE_DELAY,
+        max_timeout=DISCORD_RETRY_MAX_DELAY,
+        statuses={429},
+        exceptions={aiohttp.ClientConnectorError, aiohttp.ConnectionTimeoutError}
+    )
+
+async def post_alert(session, channel_id, body):
+    async with session.post(
+        ALERT_URLS[channel_id],
+        headers=DISCORD_HEADERS,
+        data=body
+    ) as resp:
+        if resp.status >= 400:
+            logging.error(f"Alert to channel {channel_id} failed: HTTP {resp.status}")
+        return resp.status
+
+async def send_alert(session, title, description, color, timestamp):
+    # Serialized once with orjson (handles the datetime natively) for all channels
+    body = orjson.dumps({"embeds": [{
+        "title": title,
+        "description": description,
+        "color": color,
+        "timestamp": timestamp
+    }]})
+
+    # Post to every channel concurrently over the shared session
+    results = await asyncio.gather(
+        *(post_alert(session, cid, body) for cid in CHANNEL_IDS),
+        return_exceptions=True
+    )
+    for channel_id, result in zip(CHANNEL_IDS, results):
+        if isinstance(result, Exception):
+            logging.error(f"Alert to channel {channel_id} failed: {result}")
+
+def queue_alert(title, description, color):
+    # Stamped here so a backlog behind retries doesn't delay the event time
+    try:
+        ALERT_Q.put_nowait((title, description, color, datetime.now(UTC)))
+    except asyncio.QueueFull:
+        logging.warning(f"Alert queue full, dropping alert: {title}")
+
+async def alert_worker(session):
+    while True:
+        title, description, color, timestamp = await ALERT_Q.get()
+        try:
+            await send_alert(session, title, description, color, timestamp)
+        except Exception as e:
+            logging.error(f"Failed to send alert '{title}': {e}")
+        finally:
+            ALERT_Q.task_done()
 
 # ======================
 # MAIN LOOP
 # ======================
+async def wait_until(deadline):
+    """Sleep until the monotonic deadline; return True if STOP was set meanwhile."""
+    # wait_for with timeout=0 raises even if the event is already set
+    if STOP.is_set():
+        return True
+    try:
+        await asyncio.wait_for(STOP.wait(), timeout=max(0, deadline - time.monotonic()))
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+async def handle_temperature(temp, bot_alive):
+    if temp >= TEMP_ALERT_THRESHOLD:
+        throttle_bot()
+        if temp >= TEMP_KILL_THRESHOLD:
+            queue_alert("🔥 BOT KILLED", f"Temp {temp}°C", 0xe74c3c)
+            await stop_bot(force=True)
+
+    elif temp < TEMP_RESUME_THRESHOLD:
+        if not bot_alive:
+            queue_alert("❄️ Restarting Bot", f"Temp {temp}°C", 0x2ecc71)
+            await start_bot()
+        elif IS_THROTTLED:
+            unthrottle_bot()
+
 async def monitor_temperature():
     logging.info("Temperature monitor online")
-    await send_alert("🌡️ Monitor Online", "Temperature manager started.", 0x2ecc71)
 
-    start_bot()
+    # One session for the monitor's lifetime keeps the Discord connection warm
+    async with RetryClient(
+        client_session=aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)),
+        retry_options=alert_retry_options()
+    ) as session:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, STOP.set)
 
-    while True:
-        temp = get_pi_temperature()
-        if temp is None:
-            await asyncio.sleep(CHECK_INTERVAL)
-            continue
+        worker = asyncio.create_task(alert_worker(session))
+        queue_alert("🌡️ Monitor Online", "Temperature manager started.", 0x2ecc71)
 
-        logging.info(f"Temperature: {temp}°C")
+        await start_bot()
 
-        if temp >= TEMP_ALERT_THRESHOLD:
-            throttle_bot()
-            if temp >= TEMP_KILL_THRESHOLD:
-                await send_alert("🔥 BOT KILLED", f"Temp {temp}°C", 0xe74c3c)
-                stop_bot(force=True)
+        # Ticks are scheduled on a monotonic clock so they don't drift
+        deadline = time.monotonic()
+        ticks = 0
+        sensor_errors = 0
+        while not STOP.is_set():
+            deadline = max(deadline + CHECK_INTERVAL, time.monotonic())
 
-        elif temp < TEMP_RESUME_THRESHOLD:
-            if BOT_PROCESS is None or BOT_PROCESS.poll() is not None:
-                await send_alert("❄️ Restarting Bot", f"Temp {temp}°C", 0x2ecc71)
-                start_bot()
-            elif IS_THROTTLED:
-                unthrottle_bot()
+            temp = get_pi_temperature()
+            if temp is None:
+                sensor_errors += 1
+                if MONITOR_STRICT and sensor_errors == MAX_SENSOR_ERRORS:
+                    queue_alert(
+                        "⚠️ Temperature Sensor Error",
+                        f"{sensor_errors} consecutive temperature reads failed.",
+                        0xf39c12
+                    )
+            else:
+                sensor_errors = 0
+                ticks += 1
+                # Between the resume and alert thresholds nothing ever happens,
+                # so the steady state skips the ladder and only logs occasionally
+                steady = TEMP_RESUME_THRESHOLD <= temp < TEMP_ALERT_THRESHOLD
+                if not steady or ticks % TEMP_LOG_EVERY == 0:
+                    logging.info(f"Temperature: {temp}°C")
+                if not steady:
+                    # Check liveness once per tick
+                    await handle_temperature(temp, bot_is_alive())
 
-        await asyncio.sleep(CHECK_INTERVAL)
+            flush_state()
+            await asyncio.to_thread(rotate_bot_log)
+            if await wait_until(deadline):
+                break
+
+        logging.info("Temperature monitor stopping")
+        flush_state()
+        if MONITOR_STRICT:
+            queue_alert("🛑 Monitor Offline", "Temperature manager shutting down.", 0x95a5a6)
+
+        # Give pending alerts a chance to go out before the session closes
+        try:
+            await asyncio.wait_for(ALERT_Q.join(), timeout=ALERT_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logging.warning(f"Dropping {ALERT_Q.qsize()} unsent alert(s) on shutdown")
+        worker.cancel()
 
 # ======================
 # ENTRY
 # ======================
 if __name__ == "__main__":
-    if not TOKEN or not CHANNEL_IDS:
-        raise RuntimeError("Missing DISCORD_TOKEN or CHANNEL_IDS")
-
     asyncio.run(monitor_temperature())